@@ -1,29 +1,27 @@
-import random
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
 from app.models.memory import UserWordMemory
 from app.models.sentence import Sentence, SourceType
 from app.models.session import SessionAttempt, SessionSummary
-from app.models.word import Word
 from app.services.error_classifier import classify_error  # ← Import this
-from app.services.rag import generate_sentences_with_rag
+from app.services.rag import stream_sentences_with_rag
 from app.services.session_analyzer import (
     analyze_session,
-    detect_strengths,
-    detect_weaknesses,
     generate_headline,
     generate_linguistic_insight,
     generate_next_focus,
 )
 from app.services.srs import get_due_words, update_on_correct, update_on_wrong
 from app.services.validator import validate_answer
-from app.services.verb_drill import generate_drill_sentences, should_enter_drill
+from app.services.verb_drill import get_drill_sentences, should_enter_drill
 
 router = APIRouter()
 
@@ -37,46 +35,70 @@ class SubmitAnswer(BaseModel):
     session_id: str  # ← NEW: Frontend sends this
 
 
+def generated_sentence_row(item: dict, word_id: int) -> dict:
+    return {
+        "text": item["sentence"],
+        "blanked_text": item["blanked"],
+        "target_word_id": word_id,
+        "tense": item.get("tense"),
+        "source": SourceType.LLM,
+    }
+
+
+async def store_generated_sentences(stream, word_id: int):
+    """Background task: drain the rest of a RAG stream into the sentences table."""
+    try:
+        rows = [generated_sentence_row(item, word_id) async for item in stream]
+        if not rows:
+            return
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Sentence), rows)
+            await db.commit()
+        print(f"✅ Stored {len(rows)} more generated sentences")
+    except Exception as e:
+        print(f"❌ Failed to store generated sentences: {e}")
+
+
 @router.get("/next-question")
-def get_next_question(db: Session = Depends(get_db)):
-    due_words = get_due_words(db, limit=1)
+async def get_next_question(
+    background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)
+):
+    due_words = await get_due_words(db, limit=1)
     if not due_words:
         return {"message": "No words due for review!"}
 
     memory = due_words[0]
-    word = db.query(Word).get(memory.word_id)
+    word = memory.word
 
     if not word:
         raise HTTPException(404, "Word not found")
 
-    sentences = (
-        db.query(Sentence).filter(Sentence.target_word_id == memory.word_id).all()
+    # Let Postgres pick one sentence instead of loading all of them
+    result = await db.execute(
+        select(Sentence)
+        .where(Sentence.target_word_id == word.id)
+        .order_by(func.random())
+        .limit(1)
     )
+    sentence = result.scalars().first()
 
-    if not sentences:
-        generated = generate_sentences_with_rag(
+    if sentence is None:
+        # Answer with the first generated sentence as soon as it streams in
+        stream = stream_sentences_with_rag(
             db, word.text, word.part_of_speech.value, count=5
         )
+        first = await anext(stream, None)
 
-        for item in generated:
-            sentence = Sentence(
-                text=item["sentence"],
-                blanked_text=item["blanked"],
-                target_word_id=word.id,
-                tense=item.get("tense"),
-                source=SourceType.LLM,
-            )
-            db.add(sentence)
-
-        db.commit()
-        sentences = (
-            db.query(Sentence).filter(Sentence.target_word_id == memory.word_id).all()
-        )
+        if first is None:
+            raise HTTPException(404, "No sentences available")
 
-    if not sentences:
-        raise HTTPException(404, "No sentences available")
+        sentence = Sentence(**generated_sentence_row(first, word.id))
+        db.add(sentence)
+        await db.commit()
 
-    sentence = random.choice(sentences)
+        # The rest of the sentences are stored after the response is sent
+        background_tasks.add_task(store_generated_sentences, stream, word.id)
 
     return {
         "sentence": sentence.blanked_text,
@@ -88,19 +110,22 @@ def get_next_question(db: Session = Depends(get_db)):
 
 
 @router.post("/submit-answer")
-def submit_answer(data: SubmitAnswer, db: Session = Depends(get_db)):
-    memory = (
-        db.query(UserWordMemory).filter(UserWordMemory.word_id == data.word_id).first()
+async def submit_answer(data: SubmitAnswer, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(UserWordMemory)
+        .options(joinedload(UserWordMemory.word))
+        .where(UserWordMemory.word_id == data.word_id)
     )
+    memory = result.scalars().first()
 
-    word = db.query(Word).get(data.word_id)
+    if not memory:
+        raise HTTPException(404, "Memory record not found")
+
+    word = memory.word
 
     if not word:
         raise HTTPException(404, "Word not found")
 
-    if not memory:
-        raise HTTPException(404, "Memory record not found")
-
     # Validate answer
     is_correct = validate_answer(data.user_input, word.text)
 
@@ -113,28 +138,28 @@ def submit_answer(data: SubmitAnswer, db: Session = Depends(get_db)):
         correct_answer=word.text,
         is_correct=is_correct,
         response_time_ms=data.response_time_ms,  # ← Fixed field name
-        error_type=classify_error(data.user_input, word.text)
-        if not is_correct
-        else None,
+        error_type=(
+            classify_error(data.user_input, word.text) if not is_correct else None
+        ),
         confused_with=data.user_input if not is_correct else None,
     )
     db.add(attempt)
 
     # Update SRS
     if is_correct:
-        update_on_correct(memory, db)
+        await update_on_correct(memory, db)
     else:
-        update_on_wrong(memory, db)
+        await update_on_wrong(memory, db)
 
         # Check if verb drill needed
         if should_enter_drill(memory, word):
             return {
                 "correct": False,
                 "next_action": "verb_drill",
-                "drill_sentences": generate_drill_sentences(word, 10),
+                "drill_sentences": await get_drill_sentences(word, data.session_id),
             }
 
-    db.commit()  # ← Commit the attempt
+    await db.commit()  # ← Commit the attempt
 
     return {
         "correct": is_correct,
@@ -144,15 +169,16 @@ def submit_answer(data: SubmitAnswer, db: Session = Depends(get_db)):
 
 
 @router.get("/session-summary/{session_id}")
-def get_session_summary(session_id: str, db: Session = Depends(get_db)):
+async def get_session_summary(session_id: str, db: AsyncSession = Depends(get_db)):
     """
     Generate the 'What Changed Today?' screen.
     """
 
     # Check if already generated (cached)
-    existing = (
-        db.query(SessionSummary).filter(SessionSummary.session_id == session_id).first()
+    result = await db.execute(
+        select(SessionSummary).where(SessionSummary.session_id == session_id)
     )
+    existing = result.scalars().first()
 
     if existing:
         return {
@@ -164,25 +190,24 @@ def get_session_summary(session_id: str, db: Session = Depends(get_db)):
         }
 
     # Generate fresh analysis
-    attempts = (
-        db.query(SessionAttempt).filter(SessionAttempt.session_id == session_id).all()
-    )
+    analysis = await analyze_session(session_id, db)
+    if not analysis["total"]:
+        raise HTTPException(404, "No attempts recorded for this session")
 
-    analysis = analyze_session(session_id, db)
-    strengths = detect_strengths(attempts, db)
-    weaknesses = detect_weaknesses(attempts, db)
+    strengths = analysis["strengths"]
+    weaknesses = analysis["weaknesses"]
 
     headline = generate_headline(analysis, strengths, weaknesses)
-    insight = generate_linguistic_insight(analysis, attempts, db)
+    insight = await generate_linguistic_insight(analysis)
     next_focus = generate_next_focus(weaknesses)
 
     # Save summary
     summary = SessionSummary(
         session_id=session_id,
-        started_at=attempts[0].timestamp,
-        ended_at=attempts[-1].timestamp,
-        total_attempts=len(attempts),
-        correct_count=sum(1 for a in attempts if a.is_correct),
+        started_at=analysis["started_at"],
+        ended_at=analysis["ended_at"],
+        total_attempts=analysis["total"],
+        correct_count=analysis["correct"],
         headline=headline,
         strengths=strengths,
         weaknesses=weaknesses,
@@ -190,7 +215,7 @@ def get_session_summary(session_id: str, db: Session = Depends(get_db)):
         next_focus=next_focus,
     )
     db.add(summary)
-    db.commit()
+    await db.commit()
 
     return {
         "headline": headline,
@@ -2,6 +2,8 @@ import os
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -12,14 +14,63 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found in .env file!")
 
-engine = create_engine(DATABASE_URL)
+
+def async_database_url(url: str):
+    """Point a postgresql:// URL at the asyncpg driver."""
+    url = make_url(url).set(drivername="postgresql+asyncpg")
+
+    # asyncpg takes `ssl`, not libpq's `sslmode`
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"]).update_query_dict(
+            {"ssl": sslmode}
+        )
+    return url
+
+
+# Sized for Supabase's 60-connection limit. LIFO keeps hot connections warm,
+# pre-ping drops sockets the server has already closed, and a short
+# pool_timeout fails fast instead of queueing requests behind a full pool.
+POOL_OPTIONS = {
+    "pool_size": 20,
+    "max_overflow": 10,
+    "pool_timeout": 5,
+    "pool_recycle": 280,
+    "pool_pre_ping": True,
+    "pool_use_lifo": True,
+}
+
+# Server-side timeouts (ms) so abandoned sessions don't pin connections
+SERVER_SETTINGS = {
+    "idle_session_timeout": "300000",
+    "idle_in_transaction_session_timeout": "60000",
+}
+
+# Sync engine: scripts and Base.metadata.create_all
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={
+        "options": " ".join(f"-c {k}={v}" for k, v in SERVER_SETTINGS.items())
+    },
+    echo=False,
+    **POOL_OPTIONS,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine: FastAPI routes
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    connect_args={"server_settings": SERVER_SETTINGS},
+    echo=False,
+    **POOL_OPTIONS,
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
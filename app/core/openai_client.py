@@ -0,0 +1,39 @@
+"""
+Shared OpenAI clients.
+
+Every module used to build its own client at import time, each with its own
+connection pool. The app now reuses one async client whose httpx pool speaks
+HTTP/2, so concurrent requests multiplex over a few warm TLS connections.
+"""
+
+import os
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+
+load_dotenv()
+
+# Cut off tail-latency requests and let the SDK retry them (exponential
+# backoff) on a fresh connection instead of blocking the caller
+TIMEOUT_SECONDS = 15.0
+MAX_RETRIES = 3
+
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+)
+
+aclient = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=http_client,
+    timeout=TIMEOUT_SECONDS,
+    max_retries=MAX_RETRIES,
+)
+
+# Sync client for scripts and offline tools (VectorStore)
+client = OpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    timeout=TIMEOUT_SECONDS,
+    max_retries=MAX_RETRIES,
+)
@@ -0,0 +1,36 @@
+"""
+In-process cache of search-query embeddings.
+
+Kept free of database imports so offline tools (VectorStore) can embed a
+query without DATABASE_URL or engine pools. The persisted layer lives in
+app.services.embedding_service.aget_query_embedding.
+"""
+
+import numpy as np
+from cachetools import LRUCache
+
+from app.core.openai_client import client
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Query text -> embedding. Search queries are templated ("sentences using the
+# French word X") so the same strings come back over and over. Entries are
+# read-only float32 arrays (~6 KB each); pgvector binds them directly.
+query_embeddings = LRUCache(maxsize=10_000)
+
+
+def freeze_embedding(values) -> np.ndarray:
+    """float32 copy that callers can't mutate, since cached vectors are shared"""
+    embedding = np.array(values, dtype=np.float32)
+    embedding.flags.writeable = False
+    return embedding
+
+
+def get_query_embedding(text: str) -> np.ndarray:
+    """Embed a search query, reusing the cached vector when available."""
+    embedding = query_embeddings.get(text)
+    if embedding is None:
+        response = client.embeddings.create(input=text, model=EMBEDDING_MODEL)
+        embedding = freeze_embedding(response.data[0].embedding)
+        query_embeddings[text] = embedding
+    return embedding
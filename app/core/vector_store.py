@@ -1,75 +1,160 @@
 import os
-import pickle
+import warnings
 
 import numpy as np
 from dotenv import load_dotenv
-from openai import OpenAI
+
+from app.core.query_embedding_cache import get_query_embedding
+
+try:
+    import faiss
+except ImportError:  # Exact NumPy search instead of HNSW
+    faiss = None
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+HNSW_NEIGHBORS = 32
+SCORE_BLOCK_ROWS = 8192
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place so inner product equals cosine similarity."""
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def search_in_memory(query_vec, embeddings_np: np.ndarray, top_k: int = 5):
+    """
+    Exact top_k search over an (N, D) matrix of normalized embeddings.
+
+    One matrix-vector product scores every row, then argpartition selects the
+    best top_k without sorting all N scores. Returns row indices, best first.
+    """
+    query = np.asarray(query_vec, dtype=np.float32)
+    query = query / np.linalg.norm(query)
+    top_k = min(top_k, len(embeddings_np))
+    if top_k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if embeddings_np.dtype == np.float32:
+        scores = embeddings_np @ query
+    else:
+        # NumPy has no BLAS kernel for float16; upcast block by block so the
+        # full matrix is never duplicated in float32
+        scores = np.concatenate(
+            [
+                embeddings_np[i : i + SCORE_BLOCK_ROWS].astype(np.float32) @ query
+                for i in range(0, len(embeddings_np), SCORE_BLOCK_ROWS)
+            ]
+        )
+
+    idx = np.argpartition(-scores, top_k - 1)[:top_k]
+    return idx[np.argsort(-scores[idx])]
 
 
 class VectorStore:
-    def __init__(self, cache_path="app/database/tatoeba_vectors.pkl"):
+    def __init__(self, cache_path="app/database/tatoeba_vectors.npz", dtype=np.float32):
         """
         Initialize the store.
-        It automatically tries to load the pre-computed vectors from the .pkl file.
+        It automatically tries to load the pre-computed vectors from the .npz file.
+
+        dtype=np.float16 halves the memory held by the exact-search matrix at
+        the cost of slower scoring; FAISS always indexes float32.
+
+        Deprecated: the app searches sentences.embedding through pgvector
+        (app.services.rag.semantic_search). This store is only kept for
+        offline experiments on the ingest_tatoeba.py cache.
         """
-        self.vocabulary_db = []
+        warnings.warn(
+            "VectorStore is deprecated; use app.services.rag.semantic_search",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        self.meta = []
+        self.matrix = None
+        self.index = None
+        self.dtype = dtype
         self.cache_path = cache_path
         self.load_cache()
 
     def load_cache(self):
-        """Loads the .pkl file into memory."""
+        """Loads the .npz file into memory."""
         if os.path.exists(self.cache_path):
             print(f"📦 Found cache at {self.cache_path}. Loading...")
             try:
-                with open(self.cache_path, "rb") as f:
-                    self.vocabulary_db = pickle.load(f)
-                print(f"✅ Successfully loaded {len(self.vocabulary_db)} items.")
+                # french/english are object arrays, hence allow_pickle
+                with np.load(self.cache_path, allow_pickle=True) as cache:
+                    self.matrix = np.ascontiguousarray(
+                        cache["vectors"], dtype=np.float32
+                    )
+                    self.meta = [
+                        {"french": french, "english": english}
+                        for french, english in zip(
+                            cache["french"].tolist(), cache["english"].tolist()
+                        )
+                    ]
+                print(f"✅ Successfully loaded {len(self.meta)} items.")
             except Exception as e:
                 print(f"❌ Error loading cache: {e}")
+                return
+            self.build_index()
         else:
             print(f"⚠️ Warning: No cache found at {self.cache_path}.")
             print("   (Did you run scripts/ingest_tatoeba.py?)")
 
+    def build_index(self):
+        """
+        Indexes the (N, 1536) float32 matrix with HNSW when FAISS is
+        installed. Rows are L2-normalized so the inner product equals
+        cosine similarity.
+        """
+        if not self.meta:
+            return
+
+        # Already unit-length for caches from the current ingest script;
+        # kept so older caches still score correctly
+        normalize_rows(self.matrix)
+
+        if faiss is None:
+            self.matrix = self.matrix.astype(self.dtype, copy=False)
+            print(f"🧮 Loaded {len(self.meta)} vectors (exact NumPy search)")
+            return
+
+        self.index = faiss.IndexHNSWFlat(
+            self.matrix.shape[1], HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT
+        )
+        self.index.add(self.matrix)
+        print(f"🧭 Indexed {self.index.ntotal} vectors (HNSW, M={HNSW_NEIGHBORS})")
+
     def search(self, user_query, top_k=5):
         """
         The RAG Retriever.
         1. Vectorizes the user's query.
-        2. Scans the loaded vocabulary_db for matches.
+        2. Looks up the nearest neighbours (FAISS HNSW or one NumPy GEMV).
         """
-        if not self.vocabulary_db:
+        if self.matrix is None:
             return []
 
         # 1. Vectorize the User's Query (e.g., "Story about travel")
         try:
-            query_vector = (
-                client.embeddings.create(
-                    input=user_query, model="text-embedding-3-small"
-                )
-                .data[0]
-                .embedding
-            )
+            query_vector = get_query_embedding(user_query)
         except Exception as e:
             print(f"API Error during search: {e}")
             return []
 
-        scored_results = []
-
-        # 2. Linear Scan (Dot Product)
-        # We compare the query vector against every vector in our list.
-        for entry in self.vocabulary_db:
-            # entry is { 'french': '...', 'english': '...', 'vector': [...] }
-            score = np.dot(query_vector, entry["vector"])
-            scored_results.append((score, entry))
+        # The cached query vector is read-only, so normalize into a new array
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / np.linalg.norm(query)
+        top_k = min(top_k, len(self.meta))
 
-        # 3. Sort by Score (Highest first)
-        scored_results.sort(key=lambda x: x[0], reverse=True)
+        # 2a. Approximate nearest-neighbour search (cosine via inner product)
+        if self.index is not None:
+            _, indices = self.index.search(query[None, :], top_k)
+            # FAISS pads with -1 when fewer than top_k neighbours are reachable
+            return [self.meta[i] for i in indices[0] if i >= 0]
 
-        # Return just the dictionary data (stripping the score)
-        return [item[1] for item in scored_results[:top_k]]
+        # 2b. Exact search over the in-memory matrix
+        return [self.meta[i] for i in search_in_memory(query, self.matrix, top_k)]
 
 
 # --- SELF-TEST ---
@@ -77,7 +162,7 @@ if __name__ == "__main__":
     # Test if it works immediately
     store = VectorStore()
 
-    if store.vocabulary_db:
+    if store.meta:
         print("\n--- Testing Search ---")
         results = store.search("I want to eat something", top_k=3)
         for r in results:
@@ -4,12 +4,19 @@ from fastapi.staticfiles import StaticFiles
 
 from app.api import questions
 from app.core.database import Base, engine
+from app.core.openai_client import aclient
 
 Base.metadata.create_all(bind=engine)
 app = FastAPI()
 
 app.include_router(questions.router, prefix="/api")
 
+
+@app.on_event("shutdown")
+async def close_openai_client():
+    await aclient.close()
+
+
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
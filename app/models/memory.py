@@ -1,10 +1,11 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.models.word import Word
 
 
 class UserWordMemory(Base):
@@ -17,5 +18,20 @@ class UserWordMemory(Base):
     success_streak = Column(Integer, default=0)
     last_seen: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     next_review_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now(), index=True
+        DateTime, server_default=func.now()
+    )
+
+    # FSRS card state (NULL stability = not yet reviewed under FSRS)
+    stability = Column(Float, nullable=True)
+    difficulty = Column(Float, nullable=True)
+    last_review = Column(DateTime, nullable=True)
+    card_state = Column(Integer, nullable=True)
+    card_step = Column(Integer, nullable=True)
+
+    word = relationship(Word)
+
+    __table_args__ = (
+        # Same column order as get_due_words' ORDER BY, so Postgres can walk
+        # the index and stop at LIMIT instead of sorting every due row
+        Index("ix_memory_due", "strength", "next_review_at"),
     )
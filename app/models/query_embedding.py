@@ -0,0 +1,12 @@
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, DateTime, String
+
+from app.core.database import Base
+
+
+class QueryEmbedding(Base):
+    __tablename__ = "query_embeddings"
+
+    query_hash = Column(String(40), primary_key=True)  # sha1 of the query text
+    embedding = Column(Vector(1536), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+
+from app.core.database import Base
+
+
+class RagCache(Base):
+    __tablename__ = "rag_cache"
+
+    id = Column(Integer, primary_key=True)
+    key_hash = Column(String(64), unique=True, nullable=False, index=True)
+    word_text = Column(String, nullable=False)
+    word_pos = Column(String, nullable=False)
+    count = Column(Integer, nullable=False)
+    embedding = Column(Vector(1536), nullable=True)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import JSON, Column, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Column, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.sql.sqltypes import Boolean, DateTime
 
 from app.core.database import Base
@@ -10,7 +10,7 @@ class SessionAttempt(Base):
     __tablename__ = "session_attempts"
 
     id = Column(Integer, primary_key=True)
-    session_id = Column(String, nullable=False, index=True)  # ← Added index
+    session_id = Column(String, nullable=False)
     word_id = Column(Integer, ForeignKey("words.id"))
     sentence_id = Column(Integer, ForeignKey("sentences.id"))
     user_input = Column(String)
@@ -22,6 +22,11 @@ class SessionAttempt(Base):
     error_type = Column(String, nullable=True)
     confused_with = Column(String, nullable=True)
 
+    __table_args__ = (
+        # Also serves plain session_id lookups, so no separate session_id index
+        Index("ix_session_attempts_session_correct", "session_id", "is_correct"),
+    )
+
 
 class SessionSummary(Base):
     __tablename__ = "session_summaries"
@@ -1,8 +1,10 @@
 import enum
 
-from sqlalchemy import Column, Enum, Integer, String
+from sqlalchemy import Column, Enum, Index, Integer, String
+from sqlalchemy.orm import relationship
 
 from app.core.database import Base
+from app.models.sentence import Sentence
 
 
 class POSType(enum.Enum):
@@ -24,6 +26,20 @@ class Word(Base):
     __tablename__ = "words"
 
     id = Column(Integer, primary_key=True)
-    text = Column(String, unique=True, nullable=False, index=True)
-    part_of_speech = Column(Enum(POSType), nullable=False)
-    level = Column(Enum(CEFRLevel), default=CEFRLevel.A1)
+    text = Column(String, nullable=False)
+    # Stored as short VARCHARs rather than native Postgres ENUM types
+    part_of_speech = Column(Enum(POSType, native_enum=False, length=10), nullable=False)
+    level = Column(Enum(CEFRLevel, native_enum=False, length=2), default=CEFRLevel.A1)
+
+    sentences = relationship(Sentence)
+
+    __table_args__ = (
+        # The unique index on text also carries part_of_speech and level,
+        # so lookups by text can be answered from the index alone
+        Index(
+            "ix_words_text",
+            "text",
+            unique=True,
+            postgresql_include=["part_of_speech", "level"],
+        ),
+    )
@@ -3,17 +3,95 @@ Generates embeddings on-demand for sentences that need them.
 Only called when RAG is active and sentence has no embedding.
 """
 
-import os
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.database import AsyncSessionLocal
+from app.core.openai_client import aclient
+from app.core.query_embedding_cache import (
+    EMBEDDING_MODEL,
+    freeze_embedding,
+    query_embeddings,
+)
+from app.models.query_embedding import QueryEmbedding
+from app.models.sentence import Sentence
 
-from openai import OpenAI
-from sqlalchemy.orm import Session
+EMBEDDING_BATCH_SIZE = 256
+MAX_CONCURRENT_REQUESTS = 8
 
-from app.models.sentence import Sentence
+# Persisted copies survive restarts
+QUERY_EMBEDDING_TTL = timedelta(days=30)
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+async def aget_query_embedding(text: str, persist: bool = True) -> np.ndarray:
+    """
+    Async variant of app.core.query_embedding_cache.get_query_embedding,
+    sharing the same in-process cache.
 
-def ensure_embedding(sentence: Sentence, db: Session) -> bool:
+    With persist, misses also check the query_embeddings table before
+    calling the API, and new embeddings are stored there. The table is read
+    and written in its own session, so a failed cache write can't roll back
+    or expire the caller's objects.
+    """
+    embedding = query_embeddings.get(text)
+    if embedding is not None:
+        return embedding
+
+    key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    if persist:
+        embedding = await _load_query_embedding(key)
+
+    if embedding is None:
+        response = await aclient.embeddings.create(input=text, model=EMBEDDING_MODEL)
+        embedding = freeze_embedding(response.data[0].embedding)
+        if persist:
+            await _store_query_embedding(key, embedding)
+
+    query_embeddings[text] = embedding
+    return embedding
+
+
+async def _load_query_embedding(key: str) -> np.ndarray | None:
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(QueryEmbedding.embedding).where(
+                    QueryEmbedding.query_hash == key,
+                    QueryEmbedding.expires_at > datetime.utcnow(),
+                )
+            )
+            embedding = result.scalar()
+    except Exception as e:
+        print(f"Error reading query embedding cache: {e}")
+        return None
+
+    return freeze_embedding(embedding) if embedding is not None else None
+
+
+async def _store_query_embedding(key: str, embedding: np.ndarray):
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.merge(
+                QueryEmbedding(
+                    query_hash=key,
+                    embedding=embedding,
+                    expires_at=datetime.utcnow() + QUERY_EMBEDDING_TTL,
+                )
+            )
+            await db.commit()
+    except Exception as e:
+        # Leaving the session block rolls back; a concurrent insert of the
+        # same key just means the row is already there
+        print(f"Error writing query embedding cache: {e}")
+
+
+async def ensure_embedding(sentence: Sentence, db: AsyncSession) -> bool:
     """
     Generate embedding for a sentence if it doesn't have one.
 
@@ -28,12 +106,12 @@ def ensure_embedding(sentence: Sentence, db: Session) -> bool:
 
     # Generate embedding
     try:
-        response = client.embeddings.create(
-            input=sentence.text, model="text-embedding-3-small"
+        response = await aclient.embeddings.create(
+            input=sentence.text, model=EMBEDDING_MODEL
         )
 
         sentence.embedding = response.data[0].embedding
-        db.commit()
+        await db.commit()
 
         print(f"✅ Generated embedding for: {sentence.text[:50]}...")
         return True
@@ -43,10 +121,20 @@ def ensure_embedding(sentence: Sentence, db: Session) -> bool:
         return False
 
 
-def batch_ensure_embeddings(sentences: list[Sentence], db: Session):
+async def _embed_chunk(texts: list[str], semaphore: asyncio.Semaphore) -> list:
+    async with semaphore:
+        response = await aclient.embeddings.create(input=texts, model=EMBEDDING_MODEL)
+    return [item.embedding for item in response.data]
+
+
+async def batch_ensure_embeddings(sentences: list[Sentence], db: AsyncSession):
     """
     Generate embeddings for multiple sentences at once.
-    More efficient than one-by-one.
+
+    Texts are split into chunks of EMBEDDING_BATCH_SIZE so no single request
+    exceeds the API's per-request token limit. Chunks are embedded
+    concurrently (at most MAX_CONCURRENT_REQUESTS in flight) and written back
+    in one bulk UPDATE.
     """
 
     # Filter sentences without embeddings
@@ -58,16 +146,36 @@ def batch_ensure_embeddings(sentences: list[Sentence], db: Session):
     print(f"🔄 Generating {len(need_embeddings)} embeddings...")
 
     try:
-        # Batch API call
         texts = [s.text for s in need_embeddings]
-        response = client.embeddings.create(input=texts, model="text-embedding-3-small")
+        chunks = [
+            texts[i : i + EMBEDDING_BATCH_SIZE]
+            for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        # gather preserves chunk order, so the flattened list lines up with texts
+        results = await asyncio.gather(
+            *[_embed_chunk(chunk, semaphore) for chunk in chunks]
+        )
+        embeddings = [embedding for chunk in results for embedding in chunk]
+
+        # Bulk UPDATE by primary key
+        await db.execute(
+            update(Sentence),
+            [
+                {"id": sentence.id, "embedding": embedding}
+                for sentence, embedding in zip(need_embeddings, embeddings)
+            ],
+        )
+        await db.commit()
 
-        # Assign embeddings
-        for sentence, embedding_data in zip(need_embeddings, response.data):
-            sentence.embedding = embedding_data.embedding
+        # Reflect the bulk UPDATE on the loaded objects without marking them
+        # dirty, or the next flush would re-send one UPDATE per sentence
+        for sentence, embedding in zip(need_embeddings, embeddings):
+            set_committed_value(sentence, "embedding", embedding)
 
-        db.commit()
         print(f"✅ Generated {len(need_embeddings)} embeddings")
 
     except Exception as e:
+        await db.rollback()
         print(f"❌ Batch embedding failed: {e}")
@@ -8,7 +8,7 @@ def classify_error(user_input: str, correct: str) -> str:
     if len(user) == len(correct):
         return "conjugation"
 
-    if levenshtein_distance(user, correct) > 3:
+    if levenshtein_distance(user, correct, score_cutoff=3) > 3:
         return "substitution"
 
     return "spelling"
@@ -1,13 +1,11 @@
 import json
-import os
-import re
 
-from openai import OpenAI
+from app.core.openai_client import aclient
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-
-def generate_sentences_for_word(word_text: str, count: int = 5, level: str = "A2"):
+async def generate_sentences_for_word(
+    word_text: str, count: int = 5, level: str = "A2"
+):
     prompt = f"""
 You are a French language teacher.
 
@@ -22,16 +20,17 @@ Requirements:
 - Return ONLY valid JSON (no markdown)
 
 Format:
-[
+{{"sentences": [
   {{"sentence": "Je vais à l'école", "blanked": "Je ___ à l'école", "tense": "présent"}},
   {{"sentence": "Il est allé au marché", "blanked": "Il est ___ au marché", "tense": "passé composé"}}
-]
+]}}
 """
 
-    response = client.chat.completions.create(
+    response = await aclient.chat.completions.create(
         model="gpt-4.1-mini",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.4,
+        response_format={"type": "json_object"},
     )
 
     content = response.choices[0].message.content
@@ -39,12 +38,8 @@ Format:
         raise ValueError("LLM response content is None")
     response_text = content.strip()
 
-    # Parse JSON safely
+    # JSON mode guarantees an object; a truncated reply can still fail to parse
     try:
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        # Fallback: extract JSON block
-        match = re.search(r"\[.*\]", response_text, re.DOTALL)
-        if match:
-            return json.loads(match.group())
+        return json.loads(response_text)["sentences"]
+    except (json.JSONDecodeError, KeyError):
         return []
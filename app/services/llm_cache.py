@@ -0,0 +1,109 @@
+"""
+Semantic response cache for RAG sentence generation.
+
+Exact hits are keyed on sha256(word_text|word_pos|count). On a miss, the
+query embedding is compared against cached query embeddings with pgvector
+and a close enough match is reused instead of calling the LLM again.
+
+Every read and write runs in its own session, so a cache error never rolls
+back, aborts or expires the caller's request session.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.rag_cache import RagCache
+
+CACHE_TTL = timedelta(days=30)
+SIMILARITY_THRESHOLD = 0.92
+
+
+def cache_key(word_text: str, word_pos: str, count: int) -> str:
+    raw = f"{word_text}|{word_pos}|{count}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def get_cached_sentences(key: str) -> Optional[List[Dict]]:
+    """Exact lookup by cache key. Returns None on miss or expiry."""
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(RagCache.payload).where(
+                    RagCache.key_hash == key, RagCache.expires_at > datetime.utcnow()
+                )
+            )
+            return result.scalar()
+    except Exception as e:
+        print(f"Error reading RAG cache: {e}")
+        return None
+
+
+async def find_similar_sentences(
+    query_embedding, word_pos: str, count: int
+) -> Optional[List[Dict]]:
+    """
+    Payload of the nearest cached query by cosine similarity.
+
+    The sentences were generated for a different word; callers must check
+    they contain the requested word before reusing them.
+    """
+    distance = RagCache.embedding.cosine_distance(query_embedding)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(RagCache.payload, distance.label("distance"))
+                .where(
+                    RagCache.word_pos == word_pos,
+                    RagCache.count == count,
+                    RagCache.embedding.isnot(None),
+                    RagCache.expires_at > datetime.utcnow(),
+                )
+                .order_by(distance)
+                .limit(1)
+            )
+            row = result.first()
+    except Exception as e:
+        print(f"Error searching RAG cache: {e}")
+        return None
+
+    if row is None or 1 - row.distance < SIMILARITY_THRESHOLD:
+        return None
+
+    return row.payload
+
+
+async def cache_sentences(
+    key: str,
+    word_text: str,
+    word_pos: str,
+    count: int,
+    query_embedding,
+    payload: List[Dict],
+):
+    """Insert or refresh a cache entry."""
+    expires_at = datetime.utcnow() + CACHE_TTL
+
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(RagCache).where(RagCache.key_hash == key))
+            entry = result.scalars().first()
+            if entry is None:
+                entry = RagCache(key_hash=key)
+                db.add(entry)
+
+            entry.word_text = word_text
+            entry.word_pos = word_pos
+            entry.count = count
+            entry.embedding = query_embedding
+            entry.payload = payload
+            entry.expires_at = expires_at
+            await db.commit()
+    except Exception as e:
+        # Leaving the session block rolls back; a concurrent insert of the
+        # same key just means another request cached it first
+        print(f"Error writing RAG cache: {e}")
@@ -8,65 +8,176 @@ import json
 import os
 import re
 import sys
-from typing import Dict, List
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List
 
 from dotenv import load_dotenv
-from openai import OpenAI
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from app.core.openai_client import aclient
 from app.models.sentence import Sentence
+from app.services.embedding_service import aget_query_embedding
+from app.services.llm_cache import (
+    cache_key,
+    cache_sentences,
+    find_similar_sentences,
+    get_cached_sentences,
+)
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# Static instructions go first, as the system message, so every request shares
+# an identical prefix that OpenAI's prompt cache can reuse. Only the short user
+# message below changes per word.
+RAG_SYSTEM_PROMPT = """Role: You are a French language tutor creating practice exercises.
 
-def semantic_search(db: Session, query_text: str, top_k: int = 5) -> List[Sentence]:
-    """
-    Perform semantic search using pgvector.
-    Returns sentences most similar to the query.
-    """
+CRITICAL CONSTRAINT - ADAPTIVE DIFFICULTY:
+The user has already seen similar sentences at this level.
+Write sentences with **similar vocabulary complexity and grammar** to the
+examples given in the user's known context.
 
-    # Generate embedding for the query
+Requirements:
+1. Use simple, everyday French (A1-A2 level similar to the examples)
+2. If the word is a verb, vary the tense (présent, passé composé, futur simple)
+3. Keep sentences short (5-10 words)
+4. Make them natural and practical
+
+Output Format (JSON):
+{"sentences": [
+  {"sentence": "Je vais à l'école", "tense": "présent"},
+  {"sentence": "Tu es allé au marché", "tense": "passé composé"}
+]}
+
+Output ONLY the JSON object, no explanation."""
+
+RAG_USER_PROMPT = """Word: {word_text} ({word_pos})
+
+USER'S KNOWN CONTEXT:
+{context_string}
+
+Generate {count} sentences."""
+
+
+async def embed_query(query_text: str):
+    """Embed a search query. Returns None if the API call fails."""
     try:
-        response = client.embeddings.create(
-            input=query_text, model="text-embedding-3-small"
-        )
-        query_embedding = response.data[0].embedding
+        return await aget_query_embedding(query_text)
     except Exception as e:
         print(f"Error generating query embedding: {e}")
-        return []
+        return None
+
 
+async def search_by_embedding(
+    db: AsyncSession, query_embedding, top_k: int = 5
+) -> List[Sentence]:
+    """Return the sentences closest to an already computed query embedding."""
     try:
-        # Use pgvector's cosine distance for similarity search
-        results = (
-            db.query(Sentence)
-            .order_by(Sentence.embedding.cosine_distance(query_embedding))
+        # OpenAI embeddings are unit-length, so ordering by negative inner
+        # product (<#>) ranks exactly like cosine distance without the norms
+        # Callers only read text/translation; skip hydrating the 1536-dim vector
+        result = await db.execute(
+            select(Sentence)
+            .options(defer(Sentence.embedding))
+            .order_by(Sentence.embedding.max_inner_product(query_embedding))
             .limit(top_k)
-            .all()
         )
-        return results
+        return result.scalars().all()
     except Exception as e:
         print(f"Error during DB search: {e}")
         return []
 
 
-def retrieve_context(db: Session, word_text: str, top_k: int = 5) -> List[Sentence]:
+async def semantic_search(
+    db: AsyncSession, query_text: str, top_k: int = 5
+) -> List[Sentence]:
+    """
+    Perform semantic search using pgvector.
+    Returns sentences most similar to the query.
+    """
+
+    # Generate embedding for the query
+    query_embedding = await embed_query(query_text)
+    if query_embedding is None:
+        return []
+
+    return await search_by_embedding(db, query_embedding, top_k=top_k)
+
+
+def context_query(word_text: str) -> str:
+    return f"sentences using the French word {word_text}"
+
+
+async def retrieve_context(
+    db: AsyncSession, word_text: str, top_k: int = 5
+) -> List[Sentence]:
     """Retrieve contextually similar sentences for a given word."""
-    search_query = f"sentences using the French word {word_text}"
-    return semantic_search(db, search_query, top_k=top_k)
+    return await semantic_search(db, context_query(word_text), top_k=top_k)
 
 
-def generate_sentences_with_rag(
-    db: Session, word_text: str, word_pos: str, count: int = 5, top_k: int = 5
-) -> List[Dict]:
+_json_decoder = json.JSONDecoder()
+
+
+@lru_cache(maxsize=1024)
+def _blank_pattern(word_text: str) -> re.Pattern:
+    # Anchored at a token start but open-ended, so inflected forms still get
+    # blanked ("maisons" -> "___s") while "an" never matches inside "dans"
+    return re.compile(rf"(?<!\w){re.escape(word_text)}", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _token_pattern(word_text: str) -> re.Pattern:
+    # The exact word as a whole token
+    return re.compile(rf"(?<!\w){re.escape(word_text)}(?!\w)", re.IGNORECASE)
+
+
+def _drain_json_objects(buffer: str, pos: int):
+    """
+    Decode every complete {...} object in buffer starting at pos.
+    Returns (objects, pos) where pos is where the next scan should resume;
+    an object that is still being streamed is left for the next call.
+    """
+    objects = []
+    while True:
+        start = buffer.find("{", pos)
+        if start == -1:
+            return objects, pos
+        try:
+            obj, pos = _json_decoder.raw_decode(buffer, start)
+        except json.JSONDecodeError:
+            return objects, start
+        objects.append(obj)
+
+
+def _blank_item(item: Dict, word_text: str, pattern: re.Pattern | None = None) -> Dict:
+    sentence = item["sentence"]
+    # Simple blanking: replace the target word (case-insensitive)
+    pattern = pattern or _blank_pattern(word_text)
+    blanked = pattern.sub("___", sentence, count=1)
+    return {
+        "sentence": sentence,
+        "blanked": blanked,
+        "tense": item.get("tense", None),
+    }
+
+
+async def stream_sentences_with_rag(
+    db: AsyncSession, word_text: str, word_pos: str, count: int = 5, top_k: int = 5
+) -> AsyncIterator[Dict]:
     """
     Generate French sentences using RAG:
     1. RETRIEVE: Find similar sentences from your Tatoeba DB
     2. AUGMENT: Use them as context
     3. GENERATE: Create new sentences at appropriate difficulty
 
+    The completion is streamed and each sentence is yielded as soon as its
+    JSON object is complete, so callers can use the first one right away.
+    `db` is only used before the first yield, for the context search; the
+    cache reads and writes use their own sessions.
+
     Args:
         db: Database session
         word_text: The French word (e.g., "aller")
@@ -74,17 +185,47 @@ def generate_sentences_with_rag(
         count: Number of sentences to generate
         top_k: Number of similar sentences to retrieve
 
-    Returns:
-        List of dicts: [{'sentence': '...', 'blanked': '...', 'tense': '...'}]
+    Yields:
+        Dicts: {'sentence': '...', 'blanked': '...', 'tense': '...'}
     """
 
-    relevant_sentences = retrieve_context(db, word_text, top_k=top_k)
+    # --- PHASE 0: SEMANTIC CACHE ---
+    key = cache_key(word_text, word_pos, count)
+    cached = await get_cached_sentences(key)
+    if cached is not None:
+        print(f"⚡ RAG cache hit for '{word_text}'")
+        for item in cached:
+            yield item
+        return
+
+    query_embedding = await embed_query(context_query(word_text))
+    if query_embedding is None:
+        for item in await generate_basic_sentences(word_text, word_pos, count):
+            yield item
+        return
+
+    cached = await find_similar_sentences(query_embedding, word_pos, count)
+    # A neighbour is only reused if every cached sentence actually contains
+    # the requested word, so a close embedding for a different word never
+    # leaks in
+    pattern = _token_pattern(word_text)
+    if cached is not None and all(pattern.search(i["sentence"]) for i in cached):
+        print(f"⚡ RAG semantic cache hit for '{word_text}'")
+        cached = [_blank_item(item, word_text, pattern) for item in cached]
+        await cache_sentences(key, word_text, word_pos, count, query_embedding, cached)
+        for item in cached:
+            yield item
+        return
+
+    relevant_sentences = await search_by_embedding(db, query_embedding, top_k=top_k)
 
     if not relevant_sentences:
         print(
             f"⚠️ No similar sentences found for '{word_text}'. Using basic generation."
         )
-        return generate_basic_sentences(word_text, word_pos, count)
+        for item in await generate_basic_sentences(word_text, word_pos, count):
+            yield item
+        return
 
     # Format context from retrieved sentences
     context_string = "\n".join(
@@ -97,79 +238,84 @@ def generate_sentences_with_rag(
     print(f"✅ RAG: Found {len(relevant_sentences)} similar sentences for context")
 
     # --- PHASE 2: AUGMENTED PROMPT ---
-    prompt = f"""Role: You are a French language tutor creating practice exercises.
-
-Task: Generate {count} French sentences using the word "{word_text}" ({word_pos}).
-
-CRITICAL CONSTRAINT - ADAPTIVE DIFFICULTY:
-The user has already seen similar sentences at this level.
-Write sentences with **similar vocabulary complexity and grammar** to these examples:
-
-USER'S KNOWN CONTEXT:
-{context_string}
-
-Requirements:
-1. Use simple, everyday French (A1-A2 level similar to the examples)
-2. If the word is a verb, vary the tense (présent, passé composé, futur simple)
-3. Keep sentences short (5-10 words)
-4. Make them natural and practical
-
-Output Format (JSON):
-[
-  {{"sentence": "Je vais à l'école", "tense": "présent"}},
-  {{"sentence": "Tu es allé au marché", "tense": "passé composé"}}
-]
-
-Output ONLY the JSON array, no explanation."""
+    prompt = RAG_USER_PROMPT.format(
+        count=count,
+        word_text=word_text,
+        word_pos=word_pos,
+        context_string=context_string,
+    )
 
-    # --- PHASE 3: GENERATION ---
+    # --- PHASE 3: GENERATION (streamed) ---
+    results = []
+    buffer = ""
+    pos = 0
+    completed = False
     try:
-        response = client.chat.completions.create(
+        stream = await aclient.chat.completions.create(
             model="gpt-4o-mini",  # ← FIXED
-            messages=[{"role": "user", "content": prompt}],
+            messages=[
+                {"role": "system", "content": RAG_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
             max_tokens=500,
             temperature=0.7,
+            response_format={"type": "json_object"},
+            stream=True,
         )
 
-        response_text = response.choices[0].message.content.strip()
-
-        # Try to extract JSON from markdown if needed
-        json_match = re.search(r"\[.*\]", response_text, re.DOTALL)
-        if json_match:
-            response_text = json_match.group()
-
-        sentences_data = json.loads(response_text)
-
-        # Add blanked versions
-        results = []
-        for item in sentences_data:
-            sentence = item["sentence"]
-            # Simple blanking: replace the target word (case-insensitive)
-            blanked = re.sub(
-                re.escape(word_text), "___", sentence, count=1, flags=re.IGNORECASE
-            )
-
-            results.append(
-                {
-                    "sentence": sentence,
-                    "blanked": blanked,
-                    "tense": item.get("tense", None),
-                }
-            )
-
-        print(f"✅ RAG: Generated {len(results)} contextually appropriate sentences")
-        return results
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+
+            buffer += delta
+            if not pos:
+                # Sentence objects start inside the {"sentences": [...]} wrapper
+                start = buffer.find("[")
+                if start == -1:
+                    continue
+                pos = start + 1
+            items, pos = _drain_json_objects(buffer, pos)
+            for item in items:
+                if "sentence" not in item:
+                    continue
+                result = _blank_item(item, word_text)
+                # The word never appears; serving it would show the answer
+                if result["blanked"] == result["sentence"]:
+                    continue
+                results.append(result)
+                yield result
+        completed = True
 
-    except json.JSONDecodeError as e:
-        print(f"❌ RAG JSON parsing error: {e}")
-        print(f"Response was: {response_text[:200]}")
-        return generate_basic_sentences(word_text, word_pos, count)
     except Exception as e:
         print(f"❌ RAG generation error: {e}")
-        return generate_basic_sentences(word_text, word_pos, count)
 
+    if not results:
+        print(f"Response was: {buffer[:200]}")
+        for item in await generate_basic_sentences(word_text, word_pos, count):
+            yield item
+        return
+
+    print(f"✅ RAG: Generated {len(results)} contextually appropriate sentences")
+    # A stream cut off midway would otherwise be cached as the full answer
+    if not completed:
+        return
+    await cache_sentences(key, word_text, word_pos, count, query_embedding, results)
 
-def generate_basic_sentences(
+
+async def generate_sentences_with_rag(
+    db: AsyncSession, word_text: str, word_pos: str, count: int = 5, top_k: int = 5
+) -> List[Dict]:
+    """Non-streaming wrapper: collect every sentence from the RAG stream."""
+    return [
+        item
+        async for item in stream_sentences_with_rag(
+            db, word_text, word_pos, count=count, top_k=top_k
+        )
+    ]
+
+
+async def generate_basic_sentences(
     word_text: str, word_pos: str, count: int = 5
 ) -> List[Dict]:
     """
@@ -182,44 +328,29 @@ If it's a verb, vary the tense (présent, passé composé, futur).
 Keep sentences short and natural.
 
 Output Format (JSON):
-[
+{{"sentences": [
   {{"sentence": "Je vais à l'école", "tense": "présent"}},
   {{"sentence": "Tu es allé au marché", "tense": "passé composé"}}
-]
+]}}
 
-Output ONLY the JSON array, no explanation."""
+Output ONLY the JSON object, no explanation."""
 
     try:
-        response = client.chat.completions.create(  # ← FIXED
+        response = await aclient.chat.completions.create(  # ← FIXED
             model="gpt-4o-mini",  # ← FIXED
             messages=[{"role": "user", "content": prompt}],  # ← FIXED
             max_tokens=500,
             temperature=0.7,
+            response_format={"type": "json_object"},
         )
 
         response_text = response.choices[0].message.content.strip()  # ← FIXED
 
-        # Extract JSON from markdown if present
-        json_match = re.search(r"\[.*\]", response_text, re.DOTALL)
-        if json_match:
-            response_text = json_match.group()
-
-        sentences_data = json.loads(response_text)
-
-        results = []
-        for item in sentences_data:
-            sentence = item["sentence"]
-            blanked = re.sub(
-                re.escape(word_text), "___", sentence, count=1, flags=re.IGNORECASE
-            )
-
-            results.append(
-                {
-                    "sentence": sentence,
-                    "blanked": blanked,
-                    "tense": item.get("tense", None),
-                }
-            )
+        sentences_data = json.loads(response_text)["sentences"]
+
+        results = [_blank_item(item, word_text) for item in sentences_data]
+        # Drop sentences where the word couldn't be found and blanked
+        results = [r for r in results if r["blanked"] != r["sentence"]]
 
         print(f"✅ Basic generation: Generated {len(results)} sentences")
         return results
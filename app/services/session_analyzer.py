@@ -1,60 +1,92 @@
-import os
-from collections import Counter
+from collections import defaultdict
 
-from dotenv import load_dotenv
-from openai import OpenAI
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.openai_client import aclient
 from app.models.session import SessionAttempt
 from app.models.word import Word  # ← ADD THIS
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+async def analyze_session(session_id: str, db: AsyncSession) -> dict:
+    in_session = SessionAttempt.session_id == session_id
+    is_error = SessionAttempt.is_correct.is_(False)
 
-def analyze_session(session_id: str, db: Session) -> dict:
-    attempts = (
-        db.query(SessionAttempt).filter(SessionAttempt.session_id == session_id).all()
+    # Totals, average response time and time bounds in one aggregate query
+    result = await db.execute(
+        select(
+            func.count(),
+            func.sum(case((SessionAttempt.is_correct, 1), else_=0)),
+            func.avg(SessionAttempt.response_time_ms),
+            func.min(SessionAttempt.timestamp),
+            func.max(SessionAttempt.timestamp),
+        ).where(in_session)
     )
+    total, correct, avg_time, started_at, ended_at = result.one()
+    correct = correct or 0
+    avg_time = float(avg_time) if avg_time is not None else 0
+
+    result = await db.execute(
+        select(SessionAttempt.error_type, func.count())
+        .where(in_session, is_error)
+        .group_by(SessionAttempt.error_type)
+        .order_by(func.count().desc())
+    )
+    error_types = dict(result.all())
 
-    total = len(attempts)
-    correct = sum(1 for a in attempts if a.is_correct)
-
-    errors = [a for a in attempts if not a.is_correct]
-    error_types = Counter(e.error_type for e in errors)
-    confused_words = Counter(e.confused_with for e in errors if e.confused_with)
+    result = await db.execute(
+        select(SessionAttempt.confused_with, func.count())
+        .where(in_session, is_error, SessionAttempt.confused_with.isnot(None))
+        .group_by(SessionAttempt.confused_with)
+        .order_by(func.count().desc())
+    )
+    confused_words = dict(result.all())
 
-    avg_time = sum(a.response_time_ms for a in attempts) / total if total > 0 else 0
+    # Per-attempt rows are only needed for per-word stats; fetch two columns
+    result = await db.execute(
+        select(SessionAttempt.word_id, SessionAttempt.is_correct).where(in_session)
+    )
+    attempts = result.all()
 
-    strengths = detect_strengths(attempts, db)
-    weaknesses = detect_weaknesses(attempts, db)
+    strengths = await detect_strengths(attempts, db)
+    weaknesses = await detect_weaknesses(attempts, db)
 
     return {
         "total": total,
         "correct": correct,
-        "error_types": dict(error_types),
-        "confused_words": dict(confused_words),
+        "error_types": error_types,
+        "confused_words": confused_words,
         "avg_response_time": avg_time,
+        "started_at": started_at,
+        "ended_at": ended_at,
         "strengths": strengths,
         "weaknesses": weaknesses,
     }
 
 
-def detect_strengths(attempts, db) -> list:
+async def _load_words(db: AsyncSession, ids) -> dict:
+    """Fetch Words for all ids in one IN query, keyed by id."""
+    ids = list(ids)
+    if not ids:
+        return {}
+    result = await db.execute(select(Word).where(Word.id.in_(ids)))
+    return {w.id: w for w in result.scalars()}
+
+
+async def detect_strengths(attempts, db) -> list:
     strengths = []
-    word_performance = {}
+    word_performance = defaultdict(list)
 
     for attempt in attempts:
-        wid = attempt.word_id
-        if wid not in word_performance:
-            word_performance[wid] = []
-        word_performance[wid].append(attempt.is_correct)
+        word_performance[attempt.word_id].append(attempt.is_correct)
+
+    words = await _load_words(db, word_performance.keys())
 
     for wid, results in word_performance.items():  # ← FIX: was word_id
         if len(results) >= 3:  # ← FIX: was 4, changed to 3
             accuracy = sum(results) / len(results)
             if accuracy >= 0.8:
-                word = db.query(Word).get(wid)  # ← FIX: use wid
+                word = words.get(wid)  # ← FIX: use wid
                 if word:  # ← Safety check
                     strengths.append(
                         {
@@ -67,20 +99,19 @@ def detect_strengths(attempts, db) -> list:
     return strengths[:3]  # ← Max 3, not 5
 
 
-def detect_weaknesses(attempts, db) -> list:
+async def detect_weaknesses(attempts, db) -> list:
     weaknesses = []
-    word_performance = {}
+    word_performance = defaultdict(int)
 
     for attempt in attempts:
         if not attempt.is_correct:
-            wid = attempt.word_id
-            if wid not in word_performance:
-                word_performance[wid] = 0
-            word_performance[wid] += 1
+            word_performance[attempt.word_id] += 1
+
+    words = await _load_words(db, word_performance.keys())
 
     for word_id, fail_count in word_performance.items():
         if fail_count >= 2:
-            word = db.query(Word).get(word_id)
+            word = words.get(word_id)
             if word:  # ← Safety check
                 weaknesses.append(
                     {"word": word.text, "pattern": "hesitation", "count": fail_count}
@@ -89,7 +120,7 @@ def detect_weaknesses(attempts, db) -> list:
     return weaknesses[:2]
 
 
-def generate_linguistic_insight(analysis: dict, attempts, db) -> str:
+async def generate_linguistic_insight(analysis: dict) -> str:
     """Use OpenAI to generate ONE linguistic insight."""
 
     error_context = ""
@@ -115,11 +146,9 @@ Example: "Weather expressions in French use 'faire' (actions), not 'être' (stat
 Be specific and teaching-focused. No generic advice."""
 
     try:
-        response = client.chat.completions.create(
+        response = await aclient.chat.completions.create(
             model="gpt-4o-mini",  # ← FIX: correct model name
-            messages=[
-                {"role": "user", "content": prompt}  # ← FIX: was "system"
-            ],
+            messages=[{"role": "user", "content": prompt}],  # ← FIX: was "system"
         )
         return response.choices[0].message.content.strip()
     except Exception as e:
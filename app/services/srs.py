@@ -1,43 +1,85 @@
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
-from sqlalchemy.orm import Session
+from fsrs import Card, Rating, Scheduler, State
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.models.memory import UserWordMemory
 
-INTERVALS = {
-    0: timedelta(minutes=5),
-    1: timedelta(hours=2),
-    2: timedelta(hours=4),
-    3: timedelta(days=1),
-    4: timedelta(days=3),
-    5: timedelta(days=7),
-    6: timedelta(days=21),
-}
+# Default learning steps (1m, 10m) and relearning step (10m) keep mistakes
+# resurfacing within the session; FSRS takes over once a word graduates.
+scheduler = Scheduler(desired_retention=0.9)
 
+# Rows reviewed before FSRS have no card state. Their strength maps to the
+# old fixed interval, used as the starting stability (days) so progress
+# carries over instead of restarting from the learning steps.
+LEGACY_STABILITY_DAYS = {1: 2 / 24, 2: 4 / 24, 3: 1.0, 4: 3.0, 5: 7.0}
+LEGACY_DIFFICULTY = 5.0
 
-def update_on_correct(memory: UserWordMemory, db: Session):
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    """DB columns hold naive UTC; FSRS wants tz-aware datetimes."""
+    return value.replace(tzinfo=timezone.utc) if value else None
+
+
+def _to_card(memory: UserWordMemory) -> Card:
+    if memory.stability is None:
+        if not memory.strength:
+            return Card()
+        return Card(
+            state=State.Review,
+            stability=LEGACY_STABILITY_DAYS[min(memory.strength, 5)],
+            difficulty=LEGACY_DIFFICULTY,
+            due=_as_utc(memory.next_review_at),
+            last_review=_as_utc(memory.last_seen),
+        )
+
+    return Card(
+        state=State(memory.card_state),
+        step=memory.card_step,
+        stability=memory.stability,
+        difficulty=memory.difficulty,
+        due=_as_utc(memory.next_review_at),
+        last_review=_as_utc(memory.last_review),
+    )
+
+
+def _review(memory: UserWordMemory, rating: Rating, now: datetime):
+    card, _ = scheduler.review_card(_to_card(memory), rating, _as_utc(now))
+
+    memory.stability = card.stability
+    memory.difficulty = card.difficulty
+    memory.card_state = card.state.value
+    memory.card_step = card.step
+    memory.last_review = now
+    memory.last_seen = now
+    memory.next_review_at = card.due.replace(tzinfo=None)
+
+
+async def update_on_correct(memory: UserWordMemory, db: AsyncSession):
     memory.strength = min(memory.strength + 1, 5)
     memory.success_streak += 1
-    memory.last_seen = datetime.now(timezone.utc)
-    memory.next_review_at = datetime.now(timezone.utc) + INTERVALS[memory.strength]
-    db.commit()
+    _review(memory, Rating.Good, datetime.utcnow())
+    await db.commit()
 
 
-def update_on_wrong(memory: UserWordMemory, db: Session):
+async def update_on_wrong(memory: UserWordMemory, db: AsyncSession):
     memory.strength = max(memory.strength - 1, 0)
     memory.success_streak = 0
     memory.error_count += 1
-    memory.last_seen = datetime.now(timezone.utc)
-    memory.next_review_at = datetime.now(timezone.utc) + INTERVALS[0]
-    db.commit()
+    _review(memory, Rating.Again, datetime.utcnow())
+    await db.commit()
 
 
-def get_due_words(db: Session, limit: int = 10):
-    now = datetime.now(timezone.utc)
-    return (
-        db.query(UserWordMemory)
-        .filter(UserWordMemory.next_review_at <= now)
+async def get_due_words(db: AsyncSession, limit: int = 10):
+    # Columns are naive UTC timestamps; asyncpg rejects tz-aware values
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(UserWordMemory)
+        .options(joinedload(UserWordMemory.word))
+        .where(UserWordMemory.next_review_at <= now)
         .order_by(UserWordMemory.strength.asc(), UserWordMemory.next_review_at.asc())
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
@@ -1,4 +1,10 @@
 import unicodedata
+from array import array
+
+try:
+    from rapidfuzz.distance import Levenshtein
+except ImportError:  # Fall back to the pure-Python implementation
+    Levenshtein = None
 
 
 def normalize_text(text: str) -> str:
@@ -6,25 +12,72 @@ def normalize_text(text: str) -> str:
     return text
 
 
-def levenshtein_distance(s1: str, s2: str) -> int:
+def levenshtein_distance(s1: str, s2: str, score_cutoff: int | None = None) -> int:
+    """
+    Edit distance between s1 and s2.
+
+    With score_cutoff, any distance above the cutoff is reported as
+    score_cutoff + 1, which lets both implementations stop early.
+    """
+    if Levenshtein is not None:
+        # C++ bit-parallel implementation, orders of magnitude faster
+        return Levenshtein.distance(s1, s2, score_cutoff=score_cutoff)
+
+    distance = _levenshtein_python(s1, s2, score_cutoff)
+    if score_cutoff is not None and distance > score_cutoff:
+        return score_cutoff + 1
+    return distance
+
+
+def _levenshtein_python(s1: str, s2: str, score_cutoff: int | None = None) -> int:
+    # Iterate over the longer string; rows are sized by the shorter one
     if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
+        s1, s2 = s2, s1
     if len(s2) == 0:
         return len(s1)
 
-    previous_row = range(len(s2) + 1)
+    # Two preallocated rows, swapped each pass instead of building a new list
+    previous_row = array("i", range(len(s2) + 1))
+    current_row = array("i", [0]) * (len(s2) + 1)
     for i, c1 in enumerate(s1):
-        current_row = [i + 1]
+        current_row[0] = i + 1
         for j, c2 in enumerate(s2):
             insertions = previous_row[j + 1] + 1
             deletions = current_row[j] + 1
             substitutions = previous_row[j] + (c1 != c2)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
+            current_row[j + 1] = min(insertions, deletions, substitutions)
+        previous_row, current_row = current_row, previous_row
+        # Row minimums never decrease, so the cutoff is already exceeded
+        if score_cutoff is not None and min(previous_row) > score_cutoff:
+            return score_cutoff + 1
 
     return previous_row[-1]
 
 
+def within_one_edit(a: str, b: str) -> bool:
+    """
+    True if a and b differ by at most one substitution, insertion or deletion.
+
+    Linear scan: match the common prefix and suffix, then check that at most
+    one character is left over in the longer string.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    la, lb = len(a), len(b)
+    if lb - la > 1:
+        return False
+
+    prefix = 0
+    while prefix < la and a[prefix] == b[prefix]:
+        prefix += 1
+
+    suffix = 0
+    while suffix < la - prefix and a[la - 1 - suffix] == b[lb - 1 - suffix]:
+        suffix += 1
+
+    return prefix + suffix >= lb - 1
+
+
 def validate_answer(
     user_input: str, correct_answer: str, allow_typo: bool = True
 ) -> bool:
@@ -34,7 +87,7 @@ def validate_answer(
     if user == correct:
         return True
 
-    if allow_typo and levenshtein_distance(user, correct) <= 1:
+    if allow_typo and within_one_edit(user, correct):
         return True
 
     return False
@@ -1,29 +1,30 @@
 import json
-import re
 
-from openai import OpenAI
-from sqlalchemy.orm import Session
+from cachetools import TTLCache
 
+from app.core.openai_client import aclient
 from app.models.memory import UserWordMemory
 from app.models.word import POSType, Word
 
+# (verb, session_id) -> drill sentences, so repeated misses on the same verb
+# within a session reuse one generation instead of calling the LLM again
+_drill_cache = TTLCache(maxsize=1_000, ttl=3 * 60 * 60)
+
 
 def should_enter_drill(memory: UserWordMemory, word: Word) -> bool:
     return bool(
         word.part_of_speech == POSType.VERB
         and memory.error_count >= 2
-        and memory.success_count == 0
+        and memory.success_streak == 0
     )
 
 
-client = OpenAI()
-
-
-def _call_llm(prompt: str) -> str:
-    response = client.chat.completions.create(
+async def _call_llm(prompt: str) -> str:
+    response = await aclient.chat.completions.create(
         model="gpt-4.1-mini",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.4,
+        response_format={"type": "json_object"},
     )
     content = response.choices[0].message.content
     if content is None:
@@ -31,7 +32,7 @@ def _call_llm(prompt: str) -> str:
     return str(content)
 
 
-def generate_drill_sentences(word: Word, count: int = 10):
+async def generate_drill_sentences(word: Word, count: int = 10):
     # Avoid directly using ColumnElement in conditionals by extracting its value for comparison
     if str(word.part_of_speech) != str(POSType.VERB):
         raise ValueError("Drill sentences can only be generated for verbs")
@@ -49,22 +50,27 @@ Rules:
 - Return ONLY valid JSON
 
 Format:
-[
+{{"sentences": [
   {{"sentence": "...", "tense": "présent"}}
-]
+]}}
 """
 
-    raw_response = ""
     try:
-        raw_response = _call_llm(prompt)
-        return json.loads(raw_response)
-
-    except json.JSONDecodeError:
-        match = re.search(r"\[.*\]", raw_response, re.DOTALL)
-        if match:
-            return json.loads(match.group())
+        raw_response = await _call_llm(prompt)
+        return json.loads(raw_response)["sentences"]
 
     except Exception as e:
         print("LLM error:", e)
 
     return []
+
+
+async def get_drill_sentences(word: Word, session_id: str, count: int = 10):
+    """Drill sentences for this verb, generated at most once per session."""
+    key = (word.text, session_id)
+    drills = _drill_cache.get(key)
+    if drills is None:
+        drills = await generate_drill_sentences(word, count)
+        if drills:
+            _drill_cache[key] = drills
+    return drills
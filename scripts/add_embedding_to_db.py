@@ -5,30 +5,60 @@ Generates embeddings for all existing sentences and stores them in PostgreSQL.
 Run this ONCE after enabling pgvector.
 """
 
-import os
-import time
+import asyncio
 
-from dotenv import load_dotenv
-from openai import OpenAI
 from sqlalchemy.orm import Session
 
 from app.core.database import Base, SessionLocal, engine
 from app.models.sentence import Sentence
+from scripts.embedding_retry import embed_texts
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+BATCH_SIZE = 100  # Texts per embeddings request
+COMMIT_EVERY = 10  # Batches between commits
+MAX_IN_FLIGHT = 8  # Concurrent embeddings requests
 
 
-def generate_embedding(text: str):
-    """Generate embedding for a single text using OpenAI"""
+async def generate_embeddings(texts: list[str], semaphore: asyncio.Semaphore):
+    """Generate embeddings for a batch of texts in one request"""
     try:
-        response = client.embeddings.create(input=text, model="text-embedding-3-small")
-        return response.data[0].embedding
+        return await embed_texts(texts, semaphore)
     except Exception as e:
-        print(f"Error generating embedding: {e}")
+        print(f"Error generating embeddings: {e}")
         return None
 
 
+async def embed_all(db: Session, chunks: list[list[Sentence]], total: int):
+    """
+    Embed and store the chunks COMMIT_EVERY batches at a time.
+
+    Each window is committed before the next one starts, so at most one
+    window of embeddings is held in memory and an interrupted run keeps
+    everything committed so far.
+    """
+    semaphore = asyncio.Semaphore(MAX_IN_FLIGHT)
+    for start in range(0, len(chunks), COMMIT_EVERY):
+        window = chunks[start : start + COMMIT_EVERY]
+        results = await asyncio.gather(
+            *[
+                generate_embeddings([s.text for s in chunk], semaphore)
+                for chunk in window
+            ]
+        )
+
+        for batch_num, (chunk, embeddings) in enumerate(
+            zip(window, results), start + 1
+        ):
+            if embeddings:
+                for sentence, embedding in zip(chunk, embeddings):
+                    sentence.embedding = embedding
+            else:
+                print(f"⚠️  Failed to generate embeddings for batch {batch_num}")
+
+        db.commit()
+        done = min((start + len(window)) * BATCH_SIZE, total)
+        print(f"Progress: {done}/{total} ({(done / total) * 100:.1f}%)")
+
+
 def migrate_embeddings():
     """Add embeddings to all sentences in the database"""
 
@@ -50,21 +80,10 @@ def migrate_embeddings():
     print(f"🔄 Generating embeddings for {total} sentences...")
     print("⏱️  This might take a few minutes...\n")
 
-    for i, sentence in enumerate(sentences, 1):
-        # Generate embedding for the French sentence
-        embedding = generate_embedding(sentence.text)
-
-        if embedding:
-            sentence.embedding = embedding
-
-            if i % 10 == 0:
-                db.commit()
-                print(f"Progress: {i}/{total} ({(i / total) * 100:.1f}%)")
-                time.sleep(0.5)  # Rate limiting
-        else:
-            print(f"⚠️  Failed to generate embedding for: {sentence.text}")
+    chunks = [sentences[i : i + BATCH_SIZE] for i in range(0, total, BATCH_SIZE)]
 
-    db.commit()
+    # Generate embeddings for the French sentences
+    asyncio.run(embed_all(db, chunks, total))
     db.close()
 
     print(f"\n✅ Successfully added embeddings to {total} sentences!")
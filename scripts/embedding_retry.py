@@ -0,0 +1,56 @@
+"""
+Retrying embeddings requests shared by the offline scripts.
+
+SDK retries are off so concurrent batches back off independently, and a
+batch keeps its semaphore slot while it waits so retries never add to the
+requests already in flight.
+"""
+
+import asyncio
+import os
+import random
+
+from dotenv import load_dotenv
+from openai import APIConnectionError, AsyncOpenAI, RateLimitError
+
+load_dotenv()
+
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=15.0, max_retries=0)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+MAX_ATTEMPTS = 5
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if sent, else jittered backoff"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return 2**attempt + random.random()
+
+
+async def embed_texts(texts: list[str], semaphore: asyncio.Semaphore) -> list:
+    """
+    Embed a batch of texts in one request.
+
+    Rate limits and dropped connections (including timeouts) are retried up
+    to MAX_ATTEMPTS times; the last error is raised. Other errors are raised
+    immediately.
+    """
+    async with semaphore:
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                response = await client.embeddings.create(
+                    input=texts, model=EMBEDDING_MODEL
+                )
+            except (RateLimitError, APIConnectionError) as e:
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+                delay = retry_delay(e, attempt)
+                print(f"⏳ {type(e).__name__}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                # response.data is returned in input order
+                return [item.embedding for item in response.data]
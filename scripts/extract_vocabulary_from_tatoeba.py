@@ -11,6 +11,7 @@ This script:
 """
 
 import os
+import re
 import sys
 from collections import Counter
 from datetime import datetime, timedelta
@@ -32,11 +33,19 @@ SPACY_TO_POSTYPE = {
     "ADV": POSType.ADVERB,
 }
 
+# Only POS tags are used; the dependency parser, NER and lemmatizer are skipped
+DISABLED_PIPES = ["parser", "ner", "lemmatizer"]
+
+READ_BUFFER_SIZE = 1 << 20
+
+# Lowercase French words of 3+ letters (skips very short words: le, la, de)
+_TOKEN_RE = re.compile(r"\b[a-zàâäçéèêëïîôùûüÿæœ]{3,}\b")
+
 
 def load_french_model():
     """Load spaCy French model. Install if not available."""
     try:
-        nlp = spacy.load("fr_core_news_sm")
+        nlp = spacy.load("fr_core_news_sm", disable=DISABLED_PIPES)
         print("✅ Loaded spaCy French model")
         return nlp
     except OSError:
@@ -56,22 +65,20 @@ def extract_word_frequencies(filepath: str, limit: int = 50000):
     word_counter = Counter()
     processed = 0
 
-    with open(filepath, "r", encoding="utf-8") as f:
+    # Binary mode with a 1 MiB buffer: no newline translation, and only the
+    # French column is ever decoded
+    with open(filepath, "rb", buffering=READ_BUFFER_SIZE) as f:
         for line in f:
-            parts = line.strip().split("\t")
-            if len(parts) < 4:
+            # id, French, rest (English id + English text)
+            parts = line.strip().split(b"\t", 2)
+            if len(parts) < 3 or b"\t" not in parts[2]:
                 continue
 
-            french_sentence = parts[1].strip().lower()
+            french_sentence = parts[1].decode("utf-8").strip().lower()
 
             # Simple tokenization (split on whitespace, remove punctuation)
-            import re
-
-            words = re.findall(r"\b[a-zàâäçéèêëïîôùûüÿæœ]+\b", french_sentence)
-
-            for word in words:
-                if len(word) > 2:  # Skip very short words (le, la, de)
-                    word_counter[word] += 1
+            # Counter.update counts the whole list in C
+            word_counter.update(_TOKEN_RE.findall(french_sentence))
 
             processed += 1
             if processed % 10000 == 0:
@@ -93,27 +100,28 @@ def analyze_with_spacy(words_list, nlp, batch_size=1000):
 
     analyzed_words = []
 
-    # Process in batches for efficiency
-    for i in range(0, len(words_list), batch_size):
-        batch = words_list[i : i + batch_size]
-
-        # Create sentences for spaCy (it needs context)
-        # We'll use simple template: "Je [word]" for verbs, "Le [word]" for nouns
-        docs = list(nlp.pipe([f"Je {word}" for word, _ in batch]))
+    # Create sentences for spaCy (it needs context)
+    # We'll use simple template: "Je [word]" for verbs, "Le [word]" for nouns
+    # Docs are streamed across worker processes rather than built into a list
+    docs = nlp.pipe(
+        (f"Je {word}" for word, _ in words_list),
+        batch_size=batch_size,
+        n_process=max(1, (os.cpu_count() or 1) - 1),
+    )
 
-        for (word, freq), doc in zip(batch, docs):
-            # Get POS tag of our target word (usually second token)
-            if len(doc) > 1:
-                token = doc[1]  # Our word
-                pos = token.pos_
+    for i, ((word, freq), doc) in enumerate(zip(words_list, docs), 1):
+        # Get POS tag of our target word (usually second token)
+        if len(doc) > 1:
+            token = doc[1]  # Our word
+            pos = token.pos_
 
-                # Map to our enum
-                pos_type = SPACY_TO_POSTYPE.get(pos, POSType.OTHER)
+            # Map to our enum
+            pos_type = SPACY_TO_POSTYPE.get(pos, POSType.OTHER)
 
-                analyzed_words.append((word, pos_type, freq))
+            analyzed_words.append((word, pos_type, freq))
 
-        if (i + batch_size) % 5000 == 0:
-            print(f"   Analyzed {i + batch_size}/{len(words_list)} words...")
+        if i % 5000 == 0:
+            print(f"   Analyzed {i}/{len(words_list)} words...")
 
     print(f"✅ Analysis complete!")
     return analyzed_words
@@ -184,11 +192,14 @@ def seed_database_with_vocabulary(vocabulary):
 
     db = SessionLocal()
 
-    added = 0
+    # One query for every existing word instead of one per candidate
+    existing = {text for (text,) in db.query(Word.text)}
+
+    new_words = []
     for word_text, pos_type, freq in vocabulary:
-        existing = db.query(Word).filter(Word.text == word_text).first()
+        if word_text not in existing:
+            existing.add(word_text)
 
-        if not existing:
             # Estimate CEFR level based on frequency
             # Very rough heuristic: high freq = A1, low freq = B2
             if freq > 1000:
@@ -200,33 +211,31 @@ def seed_database_with_vocabulary(vocabulary):
             else:
                 level = CEFRLevel.B2
 
-            word = Word(text=word_text, part_of_speech=pos_type, level=level)
-            db.add(word)
-            added += 1
+            new_words.append(Word(text=word_text, part_of_speech=pos_type, level=level))
 
+    db.bulk_save_objects(new_words)
     db.commit()
-    print(f"✅ Added {added} new words to database")
+    print(f"✅ Added {len(new_words)} new words to database")
 
     # Create UserWordMemory for all words
     print("📝 Creating memory records...")
     now = datetime.utcnow()
 
-    for word in db.query(Word).all():
-        existing_memory = (
-            db.query(UserWordMemory).filter(UserWordMemory.word_id == word.id).first()
+    has_memory = {word_id for (word_id,) in db.query(UserWordMemory.word_id)}
+    memories = [
+        UserWordMemory(
+            word_id=word_id,
+            strength=0,
+            error_count=0,
+            success_streak=0,
+            last_seen=now - timedelta(days=1),
+            next_review_at=now - timedelta(minutes=5),
         )
+        for (word_id,) in db.query(Word.id)
+        if word_id not in has_memory
+    ]
 
-        if not existing_memory:
-            memory = UserWordMemory(
-                word_id=word.id,
-                strength=0,
-                error_count=0,
-                success_streak=0,
-                last_seen=now - timedelta(days=1),
-                next_review_at=now - timedelta(minutes=5),
-            )
-            db.add(memory)
-
+    db.bulk_save_objects(memories)
     db.commit()
     db.close()
 
@@ -12,23 +12,46 @@ from app.core.database import SessionLocal
 from app.models.sentence import Sentence, SourceType
 from app.models.word import Word
 
+SPACY_CACHE_DIR = "./.spacy_cache"  # Local copy of fr_core_news_sm
+
 # Load spaCy French model
 print("🔄 Loading spaCy French model...")
 try:
-    nlp = spacy.load("fr_core_news_sm")
-    print("✅ spaCy model loaded")
+    # Serialize the installed package once; later runs load the local copy
+    # directly instead of resolving the package again
+    if not os.path.exists(SPACY_CACHE_DIR):
+        spacy.load("fr_core_news_sm").to_disk(SPACY_CACHE_DIR)
+    # Only token.text and token.lemma_ are read. The lemmatizer needs the POS
+    # tags from tok2vec/morphologizer/attribute_ruler, but not the parser or NER.
+    nlp = spacy.load(SPACY_CACHE_DIR, disable=["parser", "ner", "senter"])
+    print(f"✅ spaCy model loaded ({', '.join(nlp.pipe_names)})")
 except OSError:
     print("❌ French model not found. Run: python -m spacy download fr_core_news_sm")
     exit(1)
 
+INSERT_BATCH_SIZE = 1000
+
+
+def read_sentence_pairs(filepath: str):
+    """Yield (french, english) pairs from the Tatoeba TSV."""
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            # id, french, id, english: maxsplit stops after the 4th field
+            # instead of stripping and splitting the whole line
+            parts = line.split("\t", 3)
+            if len(parts) < 4:
+                continue
+
+            # The last field still carries the line ending
+            yield parts[1].strip(), parts[3].strip()
 
-def create_blanked_sentence(sentence, word_to_blank):
-    """Replace target word with ___"""
-    import re
 
-    pattern = re.compile(re.escape(word_to_blank), re.IGNORECASE)
-    blanked = pattern.sub("___", sentence, count=1)
-    return blanked
+def flush_sentences(db, rows):
+    """Insert queued sentence rows as one executemany batch and commit."""
+    if rows:
+        db.bulk_insert_mappings(Sentence, rows)
+        rows.clear()
+    db.commit()
 
 
 def build_lemma_map(db):
@@ -53,30 +76,39 @@ def import_with_lemmatization(filepath: str, limit: int = 100000):
     Import sentences using spaCy lemmatizer to match all forms.
     """
 
-    db = SessionLocal()
+    # Commits every INSERT_BATCH_SIZE rows must not expire the Word objects
+    # in lemma_map, or each word.id read afterwards would reload its row
+    db = SessionLocal(expire_on_commit=False)
 
     # Build lemma map
     lemma_map = build_lemma_map(db)
+    lemmas = frozenset(lemma_map)
+
+    # Already imported (text, word) pairs, checked in memory instead of
+    # one SELECT per candidate sentence
+    existing_pairs = set(db.query(Sentence.text, Sentence.target_word_id).all())
 
+    pending = []  # Row dicts waiting for the next bulk INSERT
     imported_count = 0
     processed_count = 0
 
     print(f"🚀 Starting intelligent import with lemmatization...")
     print(f"   This will match ALL conjugations automatically!\n")
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        for line in f:
+    # Lemmatize in batches across worker processes instead of one nlp() call
+    # per sentence; the English translation rides along as the context
+    docs = nlp.pipe(
+        read_sentence_pairs(filepath),
+        as_tuples=True,
+        batch_size=1000,
+        n_process=max(1, (os.cpu_count() or 1) - 1),
+    )
+
+    # Nothing in the loop should flush the session behind our back
+    with db.no_autoflush:
+        for doc, english_translation in docs:
             processed_count += 1
-
-            parts = line.strip().split("\t")
-            if len(parts) < 4:
-                continue
-
-            french_sentence = parts[1].strip()
-            english_translation = parts[3].strip()
-
-            # Use spaCy to lemmatize the sentence
-            doc = nlp(french_sentence)
+            french_sentence = doc.text
 
             # Find words that match our vocabulary (by lemma)
             matched = False
@@ -84,42 +116,42 @@ def import_with_lemmatization(filepath: str, limit: int = 100000):
                 if matched:
                     break
 
-                lemma = token.lemma_.lower()
+                # spaCy lemmas are usually lowercase already; only build the
+                # lowercase copy when the raw lemma misses
+                lemma = token.lemma_
+                if lemma not in lemmas:
+                    lemma = lemma.lower()
 
                 # Check if this lemma exists in our vocabulary
-                if lemma in lemma_map:
+                if lemma in lemmas:
                     word = lemma_map[lemma]
 
-                    # Use the ACTUAL word from the sentence (conjugated form)
-                    actual_word = token.text
-
-                    blanked = create_blanked_sentence(french_sentence, actual_word)
+                    # Blank the ACTUAL word from the sentence (conjugated form)
+                    # at spaCy's offset, not the first matching substring
+                    start = token.idx
+                    end = start + len(token.text)
+                    blanked = french_sentence[:start] + "___" + french_sentence[end:]
 
                     # Check if this sentence already exists
-                    existing = (
-                        db.query(Sentence)
-                        .filter(
-                            Sentence.text == french_sentence,
-                            Sentence.target_word_id == word.id,
+                    key = (french_sentence, word.id)
+
+                    if key not in existing_pairs:
+                        existing_pairs.add(key)
+                        # Embedding is left NULL and generated on-demand
+                        pending.append(
+                            {
+                                "text": french_sentence,
+                                "blanked_text": blanked,
+                                "target_word_id": word.id,
+                                "source": SourceType.TATOEBA,
+                                "english_translation": english_translation,
+                            }
                         )
-                        .first()
-                    )
-
-                    if not existing:
-                        sentence = Sentence(
-                            text=french_sentence,
-                            blanked_text=blanked,
-                            target_word_id=word.id,
-                            source=SourceType.TATOEBA,
-                            english_translation=english_translation,
-                            embedding=None,  # Generated on-demand
-                        )
-                        db.add(sentence)
                         imported_count += 1
                         matched = True  # Only one word per sentence
 
-                        if imported_count % 1000 == 0:
-                            db.commit()
+                        if len(pending) >= INSERT_BATCH_SIZE:
+                            flush_sentences(db, pending)
                             print(
                                 f"Imported {imported_count} sentences "
                                 f"(processed {processed_count})..."
@@ -128,11 +160,11 @@ def import_with_lemmatization(filepath: str, limit: int = 100000):
             if imported_count >= limit:
                 break
 
-    db.commit()
+    flush_sentences(db, pending)
     db.close()
 
     print(f"\n✅ Imported {imported_count} sentences WITHOUT embeddings")
-    print(f"📊 Processed {processed_count} lines from Tatoeba")
+    print(f"📊 Processed {processed_count} sentences from Tatoeba")
     print(f"💾 Database size: ~{imported_count * 100 / 1024:.1f} KB (text only)")
     print(f"💰 Cost: $0 (embeddings generated on-demand)")
     print(f"\n🎯 Matched verb forms automatically:")
@@ -1,77 +1,121 @@
+import asyncio
 import os
-import pickle
 
 import numpy as np
 import psycopg2
 from dotenv import load_dotenv
 
+from scripts.embedding_retry import embed_texts
+
 load_dotenv()  # This loads .env file
 
 DATABASE_URL = os.getenv("DATABASE_URL")
-from openai import OpenAI
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+EMBEDDING_DIMENSIONS = 1536
+EMBEDDING_BATCH_SIZE = 256  # Inputs per embeddings request
+MAX_IN_FLIGHT = 35  # Concurrent embeddings requests (tier 1 rate limits)
+SAMPLE_PERCENT = 5  # Share of sentences pages read by get_sentences_from_db
+SENTENCE_LIMIT = 4000  # Sentences embedded into the cache
 
 
 def get_sentences_from_db(limit=4000):
+    """
+    Yield lists of up to EMBEDDING_BATCH_SIZE (french, english) rows.
+
+    A named cursor keeps the result set on the server and hands rows over
+    one batch at a time, so embedding can start before the query finishes.
+    """
+    conn = None
     try:
         conn = psycopg2.connect(DATABASE_URL)
-        cursor = conn.cursor()
-        query = f"""SELECT text, english_translation
-        FROM sentences
-        WHERE english_translation IS NOT NULL
-        ORDER BY RANDOM()
-        LIMIT {limit}"""
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        conn.close()
-        print(f"Retrieved {len(rows)} sentences")
-        return rows
+        with conn.cursor(name="ingest_sentences") as cursor:
+            cursor.itersize = EMBEDDING_BATCH_SIZE
+            # Sample ~SAMPLE_PERCENT% of the table's pages instead of sorting
+            # every row by RANDOM()
+            query = f"""SELECT text, english_translation
+            FROM sentences TABLESAMPLE SYSTEM ({SAMPLE_PERCENT})
+            WHERE english_translation IS NOT NULL
+            LIMIT %s"""
+            cursor.execute(query, (limit,))
+            while True:
+                rows = cursor.fetchmany(EMBEDDING_BATCH_SIZE)
+                if not rows:
+                    break
+                yield rows
 
     except Exception as e:
         print(f"Error retrieving sentences: {e}")
-        return []
+    finally:
+        if conn is not None:
+            conn.close()
 
 
-def build_vector():
-    print("connecting to database")
-    raw_data = get_sentences_from_db(limit=4000)
+async def embed_batch(texts: list[str], sem: asyncio.Semaphore):
+    embeddings = np.array(await embed_texts(texts, sem), dtype=np.float32)
+    # Store unit-length vectors so inner product == cosine similarity
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    print(".", end="", flush=True)
+    return embeddings
 
-    if not raw_data:
-        return
-    vectors = []
-    print(f"Generating Embeddings for {len(raw_data)} sentences")
-    for french_text, english_translation in raw_data:
-        text_to_embed = f"{french_text} {english_translation}"
-        try:
-            response = client.embeddings.create(
-                model="text-embedding-3-small", input=text_to_embed
-            )
-            embedding = response.data[0].embedding
-            vectors.append(
-                {
-                    "french": french_text,
-                    "english": english_translation,
-                    "vector": np.array(embedding),
-                }
+
+async def build_vector():
+    print("connecting to database")
+    batches = get_sentences_from_db(limit=SENTENCE_LIMIT)
+    sem = asyncio.Semaphore(MAX_IN_FLIGHT)
+
+    # Start embedding each batch as soon as it arrives. The blocking fetch
+    # runs in a worker thread so requests already in flight keep going.
+    print("Generating Embeddings")
+    chunks = []
+    tasks = []
+    while (chunk := await asyncio.to_thread(next, batches, None)) is not None:
+        chunks.append(chunk)
+        tasks.append(
+            asyncio.create_task(
+                embed_batch(
+                    [
+                        f"{french_text} {english_translation}"
+                        for french_text, english_translation in chunk
+                    ],
+                    sem,
+                )
             )
-            print(f"   Processed: {french_text[:20]}...")
+        )
 
-            print(".", end="", flush=True)
-        except Exception as e:
+    if not chunks:
+        return
+    total = sum(len(chunk) for chunk in chunks)
+    print(f"\nRetrieved {total} sentences")
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # One contiguous float32 matrix plus parallel text columns
+    vectors = np.empty((total, EMBEDDING_DIMENSIONS), dtype=np.float32)
+    french_texts = []
+    english_texts = []
+    for chunk, embeddings in zip(chunks, results):
+        if isinstance(embeddings, Exception):
             print("x", end="", flush=True)
+            continue
+        vectors[len(french_texts) : len(french_texts) + len(chunk)] = embeddings
+        for french_text, english_translation in chunk:
+            french_texts.append(french_text)
+            english_texts.append(english_translation)
     print("\n")
-    output_path = "app/database/tatoeba_vectors.pkl"
+    output_path = "app/database/tatoeba_vectors.npz"
 
     # Ensure directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    with open(output_path, "wb") as f:
-        pickle.dump(vectors, f)
+    np.savez_compressed(
+        output_path,
+        vectors=vectors[: len(french_texts)],
+        french=np.array(french_texts, dtype=object),
+        english=np.array(english_texts, dtype=object),
+    )
 
     print(f"✅ Success! Vector Cache saved to '{output_path}'")
     print("   You can now run your main app.")
 
 
 if __name__ == "__main__":
-    build_vector()
+    asyncio.run(build_vector())
@@ -6,6 +6,8 @@ Run this ONCE to get started testing.
 
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import select
+
 from app.core.database import Base, SessionLocal, engine
 from app.models.memory import UserWordMemory
 from app.models.sentence import Sentence, SourceType
@@ -44,13 +46,17 @@ def seed_database():
         ("dire", "to say"),
     ]
 
-    words = []
-    for french, english in verbs_data:
-        word = Word(text=french, part_of_speech=POSType.VERB, level=CEFRLevel.A1)
-        db.add(word)
-        words.append(word)
+    words = [
+        Word(text=french, part_of_speech=POSType.VERB, level=CEFRLevel.A1)
+        for french, english in verbs_data
+    ]
 
-    db.commit()
+    # Everything below goes out in one transaction
+    db.bulk_save_objects(words, return_defaults=True)
+    db.flush()
+    # Ids the sentences and memory records point at, read in one query
+    # instead of relying on the ORM state of the bulk-saved words
+    id_by_text = dict(db.execute(select(Word.text, Word.id)).all())
     print(f"✅ Created {len(words)} French verbs")
 
     # 2. Create sentences for each word
@@ -107,35 +113,36 @@ def seed_database():
         ],
     }
 
-    sentence_count = 0
-    for word in words:
-        if word.text in sentences_data:
-            for full_text, blanked_text in sentences_data[word.text]:
-                sentence = Sentence(
-                    text=full_text,
-                    blanked_text=blanked_text,
-                    target_word_id=word.id,
-                    source=SourceType.MANUAL,
-                )
-                db.add(sentence)
-                sentence_count += 1
+    sentences = [
+        Sentence(
+            text=full_text,
+            blanked_text=blanked_text,
+            target_word_id=id_by_text[word.text],
+            source=SourceType.MANUAL,
+        )
+        for word in words
+        for full_text, blanked_text in sentences_data.get(word.text, [])
+    ]
+    sentence_count = len(sentences)
 
-    db.commit()
+    db.bulk_save_objects(sentences)
     print(f"✅ Created {sentence_count} test sentences")
 
     # 3. Create UserWordMemory records (make them all due for review NOW)
     now = datetime.now(timezone.utc)
-    for word in words:
-        memory = UserWordMemory(
-            word_id=word.id,
+    memories = [
+        UserWordMemory(
+            word_id=id_by_text[word.text],
             strength=0,  # New word
             error_count=0,
-            success_count=0,
+            success_streak=0,
             last_seen=now - timedelta(days=1),  # Last seen yesterday
             next_review_at=now - timedelta(minutes=5),  # Due now!
         )
-        db.add(memory)
+        for word in words
+    ]
 
+    db.bulk_save_objects(memories)
     db.commit()
     print(f"✅ Created {len(words)} memory records (all due for review)")
 